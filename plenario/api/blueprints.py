@@ -1,7 +1,6 @@
-import json
 from time import sleep
 
-from flask import Blueprint, make_response
+from flask import Blueprint, jsonify
 
 from plenario.sensor_network.api.ifttt import get_ifttt_meta, get_ifttt_observations, ifttt_status, ifttt_test_setup
 from plenario.sensor_network.api.sensor_networks import check, get_aggregations, get_feature_metadata, \
@@ -21,58 +20,64 @@ API_VERSION = '/v1'
 prefix = API_VERSION + '/api'
 
 
-api.add_url_rule('{}{}'.format(prefix, '/timeseries'), 'timeseries', timeseries)
-api.add_url_rule('{}{}'.format(prefix, '/detail'), 'detail', detail)
-api.add_url_rule('{}{}'.format(prefix, '/detail-aggregate'), 'detail-aggregate', detail_aggregate)
-api.add_url_rule('{}{}'.format(prefix, '/datasets'), 'meta', meta)
-api.add_url_rule('{}{}'.format(prefix, '/fields/<dataset_name>'), 'point_fields', dataset_fields)
-api.add_url_rule('{}{}'.format(prefix, '/grid'), 'grid', grid)
+# One row per rule: (rule, endpoint, view function, methods). Keeping the
+# table at module scope makes the registration below a single loop and the
+# full routing surface readable at a glance.
+_ROUTES = (
+    (prefix + '/timeseries', 'timeseries', timeseries, None),
+    (prefix + '/detail', 'detail', detail, None),
+    (prefix + '/detail-aggregate', 'detail-aggregate', detail_aggregate, None),
+    (prefix + '/datasets', 'meta', meta, None),
+    (prefix + '/fields/<dataset_name>', 'point_fields', dataset_fields, None),
+    (prefix + '/grid', 'grid', grid, None),
 
-api.add_url_rule('{}{}'.format(prefix, '/weather/<table>/'), 'weather', weather)
-api.add_url_rule('{}{}'.format(prefix, '/weather-stations/'), 'weather_stations', weather_stations)
-api.add_url_rule('/secret/weather/fill/', 'weather_fill', weather_fill)
+    (prefix + '/weather/<table>/', 'weather', weather, None),
+    (prefix + '/weather-stations/', 'weather_stations', weather_stations, None),
+    ('/secret/weather/fill/', 'weather_fill', weather_fill, None),
 
-api.add_url_rule('{}{}'.format(prefix, '/shapes/'), 'shape_index', get_all_shape_datasets)
-api.add_url_rule('{}{}'.format(prefix, '/shapes/<dataset_name>'), 'shape_export', export_shape)
-api.add_url_rule('{}{}'.format(prefix, '/shapes/<polygon_dataset_name>/<point_dataset_name>'), 'aggregate', aggregate_point_data)
+    (prefix + '/shapes/', 'shape_index', get_all_shape_datasets, None),
+    (prefix + '/shapes/<dataset_name>', 'shape_export', export_shape, None),
+    (prefix + '/shapes/<polygon_dataset_name>/<point_dataset_name>', 'aggregate', aggregate_point_data, None),
 
-api.add_url_rule('{}{}'.format(prefix, '/jobs/<ticket>'), view_func=get_job_view, methods=['GET'])
+    (prefix + '/jobs/<ticket>', 'get_job_view', get_job_view, ('GET',)),
 
-api.add_url_rule('{}{}'.format(prefix, '/datadump'), 'datadump', datadump_view)
+    (prefix + '/datadump', 'datadump', datadump_view, None),
 
-# sensor networks
-api.add_url_rule('{}{}'.format(prefix, '/sensor-networks'), 'sensor_networks', get_network_metadata)
-api.add_url_rule('{}{}'.format(prefix, '/sensor-networks/<network>'), 'sensor_network', get_network_metadata)
-api.add_url_rule('{}{}'.format(prefix, '/sensor-networks/<network>/query'), 'observations', get_observations)
-api.add_url_rule('{}{}'.format(prefix, '/sensor-networks/<network>/aggregate'), 'node_aggregate', get_aggregations)
-api.add_url_rule('{}{}'.format(prefix, '/sensor-networks/<network>/download'), 'sensor_network_download', get_observations_download)
-api.add_url_rule('{}{}'.format(prefix, '/sensor-networks/<network>/map'), 'sensor_network_map', get_network_map)
-api.add_url_rule('{}{}'.format(prefix, '/sensor-networks/<network>/nearest'), 'nearest', get_observation_nearest)
-api.add_url_rule('{}{}'.format(prefix, '/sensor-networks/<network>/check'), 'check', check)
+    # sensor networks
+    (prefix + '/sensor-networks', 'sensor_networks', get_network_metadata, None),
+    (prefix + '/sensor-networks/<network>', 'sensor_network', get_network_metadata, None),
+    (prefix + '/sensor-networks/<network>/query', 'observations', get_observations, None),
+    (prefix + '/sensor-networks/<network>/aggregate', 'node_aggregate', get_aggregations, None),
+    (prefix + '/sensor-networks/<network>/download', 'sensor_network_download', get_observations_download, None),
+    (prefix + '/sensor-networks/<network>/map', 'sensor_network_map', get_network_map, None),
+    (prefix + '/sensor-networks/<network>/nearest', 'nearest', get_observation_nearest, None),
+    (prefix + '/sensor-networks/<network>/check', 'check', check, None),
 
-api.add_url_rule('{}{}'.format(prefix, '/sensor-networks/<network>/nodes'), 'network_nodes', get_node_metadata)
-api.add_url_rule('{}{}'.format(prefix, '/sensor-networks/<network>/nodes/<node>'), 'single_node', get_node_metadata)
-api.add_url_rule('{}{}'.format(prefix, '/sensor-networks/<network>/nodes/<node>/download'), 'node_download', get_node_download)
+    (prefix + '/sensor-networks/<network>/nodes', 'network_nodes', get_node_metadata, None),
+    (prefix + '/sensor-networks/<network>/nodes/<node>', 'single_node', get_node_metadata, None),
+    (prefix + '/sensor-networks/<network>/nodes/<node>/download', 'node_download', get_node_download, None),
 
-api.add_url_rule('{}{}'.format(prefix, '/sensor-networks/<network>/features'), 'features', get_feature_metadata)
-api.add_url_rule('{}{}'.format(prefix, '/sensor-networks/<network>/features/<feature>'), 'features', get_feature_metadata)
+    (prefix + '/sensor-networks/<network>/features', 'features', get_feature_metadata, None),
+    (prefix + '/sensor-networks/<network>/features/<feature>', 'features', get_feature_metadata, None),
 
-api.add_url_rule('{}{}'.format(prefix, '/sensor-networks/<network>/sensors'), 'sensors', get_sensor_metadata)
-api.add_url_rule('{}{}'.format(prefix, '/sensor-networks/<network>/sensors/<sensor>'), 'sensors', get_sensor_metadata)
+    (prefix + '/sensor-networks/<network>/sensors', 'sensors', get_sensor_metadata, None),
+    (prefix + '/sensor-networks/<network>/sensors/<sensor>', 'sensors', get_sensor_metadata, None),
 
-# IFTTT
-api.add_url_rule('/ifttt/v1/status', 'ifttt_status', ifttt_status)
-api.add_url_rule('/ifttt/v1/test/setup', 'ifttt_test_setup', ifttt_test_setup, methods=['POST'])
-api.add_url_rule('/ifttt/v1/triggers/property_comparison', 'ifttt_obs', get_ifttt_observations, methods=['POST'])
-api.add_url_rule('/ifttt/v1/triggers/property_comparison/fields/<field>/options', 'ifttt_meta', get_ifttt_meta, methods=['POST'])
+    # IFTTT
+    ('/ifttt/v1/status', 'ifttt_status', ifttt_status, None),
+    ('/ifttt/v1/test/setup', 'ifttt_test_setup', ifttt_test_setup, ('POST',)),
+    ('/ifttt/v1/triggers/property_comparison', 'ifttt_obs', get_ifttt_observations, ('POST',)),
+    ('/ifttt/v1/triggers/property_comparison/fields/<field>/options', 'ifttt_meta', get_ifttt_meta, ('POST',)),
+)
 
+for _rule, _endpoint, _view_func, _methods in _ROUTES:
+    api.add_url_rule(_rule, _endpoint, _view_func, methods=_methods)
 
-@api.route('{}{}'.format(prefix, '/flush-)cache'))
+
+@api.route('{}{}'.format(prefix, '/flush-cache'))
 def flush_cache():
     cache.clear()
-    resp = make_response(json.dumps({'status': 'ok', 'message': 'cache flushed!'}))
-    resp.headers['Content-Type'] = 'application/json'
-    return resp
+    return jsonify(status='ok', message='cache flushed!')
 
 
 @api.route('{}{}'.format(prefix, '/slow'))
@@ -3,6 +3,7 @@ import json
 import logging
 from datetime import date, datetime, time, timedelta
 from functools import update_wrapper
+from hashlib import blake2b
 from io import StringIO
 
 from flask import current_app, make_response, request
@@ -104,9 +105,30 @@ def crossdomain(origin=None, methods=None, headers=None,
 
 
 def make_cache_key(*args, **kwargs):
-    path = request.path
-    args = str(hash(frozenset(list(request.args.items()))))
-    return path + args
+    """Cache key derived from the request path and a canonical digest of the
+    query arguments. Sorting the arguments (and repeated values) means
+    reordered but equivalent queries share an entry, and the blake2b digest
+    is stable across processes, unlike hash(), which is randomized per
+    interpreter and would give every worker its own set of keys.
+    """
+    query_args = request.args.to_dict(flat=False)
+    canonical = json.dumps(
+        {key: sorted(values) for key, values in query_args.items()},
+        sort_keys=True
+    )
+    digest = blake2b(canonical.encode('utf-8'), digest_size=16).hexdigest()
+    return request.path + digest
+
+
+def dont_cache_csv():
+    """Tell flask-cache to skip data_type=csv requests. CSV detail
+    responses stream from a generator, and the Redis backend cannot
+    pickle a generator-backed response; trying to would raise inside the
+    cache layer on every request.
+
+    :returns: (bool) True when the request asks for csv output
+    """
+    return request.args.get('data_type') == 'csv'
 
 
 def make_csv(data):
@@ -15,7 +15,8 @@ from datetime import datetime, timedelta
 from dateutil import parser
 from flask import Response, jsonify, request, stream_with_context
 
-from plenario.api.common import CACHE_TIMEOUT, cache, crossdomain, make_cache_key, unknown_object_json_handler
+from plenario.api.common import CACHE_TIMEOUT, cache, crossdomain, dont_cache_csv, \
+    make_cache_key, unknown_object_json_handler
 from plenario.api.condition_builder import parse_tree
 from plenario.api.jobs import get_job, make_job_response
 from plenario.api.validator import DatasetRequiredValidator, NoDefaultDatesValidator, \
@@ -37,7 +38,7 @@ def get_job_view(ticket):
     return jsonify(get_job(ticket))
 
 
-@cache.cached(timeout=CACHE_TIMEOUT, key_prefix=make_cache_key)
+@cache.cached(timeout=CACHE_TIMEOUT, key_prefix=make_cache_key, unless=dont_cache_csv)
 @crossdomain(origin='*')
 def detail_aggregate():
     fields = ('location_geom__within', 'dataset_name', 'agg', 'obs_date__ge',
@@ -55,7 +56,7 @@ def detail_aggregate():
         return api_response.detail_aggregate_response(time_counts, validator_result)
 
 
-@cache.cached(timeout=CACHE_TIMEOUT, key_prefix=make_cache_key)
+@cache.cached(timeout=CACHE_TIMEOUT, key_prefix=make_cache_key, unless=dont_cache_csv)
 @crossdomain(origin='*')
 def detail():
     fields = ('location_geom__within', 'dataset_name', 'shape', 'obs_date__ge',
@@ -1,19 +1,42 @@
-import json
+import logging
 import os
 import tempfile
 from datetime import datetime
-from functools import reduce
+from functools import lru_cache
 from itertools import groupby
 from operator import itemgetter
 
+import csv
+import io
+
+import orjson
 import shapely.wkb
-from flask import jsonify, make_response, request
+from flask import Response, after_this_request, jsonify, make_response, request, send_file, \
+    stream_with_context
 
 from plenario.api.common import date_json_handler, make_csv, unknown_object_json_handler
 from plenario.models import ShapeMetadata
 from plenario.utils.ogr2ogr import OgrExport
 
 
+logger = logging.getLogger(__name__)
+
+
+def _dumps(obj):
+    """Serialize a response body with orjson, which is considerably faster
+    than the stdlib encoder on the large result sets the detail endpoints
+    return, and hands back bytes that Flask can use directly.
+
+    :param obj: response dictionary ready for serialization
+    :returns: (bytes) utf-8 encoded JSON
+    """
+    return orjson.dumps(
+        obj,
+        default=unknown_object_json_handler,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    )
+
+
 def make_error(msg, status_code, arguments=None):
 
     if not arguments:
@@ -67,12 +90,12 @@ def internal_error(context_msg, exception):
 
 
 def remove_columns_from_dict(rows, col_names):
+    # dict.pop with a default stays in C on a miss, unlike del with an
+    # except KeyError, which builds an exception object for every absent
+    # column (common for 'geom' in aggregate responses).
     for row in rows:
         for name in col_names:
-            try:
-                del row[name]
-            except KeyError:
-                pass
+            row.pop(name, None)
 
 
 def json_response_base(validator, objects, query=''):
@@ -113,38 +136,49 @@ def form_json_detail_response(to_remove, validator, rows):
     remove_columns_from_dict(rows, to_remove)
     resp = json_response_base(validator, rows)
     resp['meta']['total'] = len(resp['objects'])
-    resp['meta']['query'] = request.args
-    resp = make_response(
-        json.dumps(resp, default=unknown_object_json_handler),
-        200
-    )
+    resp['meta']['query'] = request.args.to_dict()
+    resp = make_response(_dumps(resp), 200)
     resp.headers['Content-Type'] = 'application/json'
     return resp
 
 
 def form_csv_detail_response(to_remove, rows, dataset_names=None):
-    to_remove.append('geom')
-    remove_columns_from_dict(rows, to_remove)
-
-    if len(rows) <= 0:
-        csv_resp = [['Sorry! Your query did not return any results.']]
-        csv_resp += [['Try to modify your date or location parameters.']]
-    else:
-        # Column headers from arbitrary row,
-        # then the values from all the others
-        csv_resp = [list(rows[0].keys())] + [list(row.values()) for row in rows]
-
-    resp = make_response(make_csv(csv_resp), 200)
+    remove_columns_from_dict(rows, to_remove + ['geom'])
 
     dname = request.args.get('dataset_name')
     # For queries where the dataset name is not provided as a query argument
     # (ex. shapes/<shapeset>/<dataset>), the dataset names can be manually
     # assigned.
     if dname is None:
-        dname = reduce(lambda name1, name2: name1 + '_and_' + name2, dataset_names)
+        dname = '_and_'.join(dataset_names)
+
+    def generate():
+        # Write rows through a small reusable buffer so the response is
+        # streamed to the client instead of being serialized in full
+        # before the first byte goes out.
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        if len(rows) <= 0:
+            writer.writerow(['Sorry! Your query did not return any results.'])
+            writer.writerow(['Try to modify your date or location parameters.'])
+            yield buffer.getvalue()
+            return
+
+        # Column headers from arbitrary row,
+        # then the values from all the others
+        writer.writerow(list(rows[0].keys()))
+        for row in rows:
+            writer.writerow(list(row.values()))
+            if buffer.tell() > 8192:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    resp = Response(stream_with_context(generate()), mimetype='text/csv')
 
     filedate = datetime.now().strftime('%Y-%m-%d')
-    resp.headers['Content-Type'] = 'text/csv'
     resp.headers['Content-Disposition'] = 'attachment; filename=%s_%s.csv' % (dname, filedate)
     return resp
 
@@ -152,27 +186,56 @@ def form_csv_detail_response(to_remove, rows, dataset_names=None):
 def form_geojson_detail_response(to_remove, rows):
     remove_columns_from_dict(rows, to_remove)
     geojson_resp = convert_result_geoms(rows)
-    resp = make_response(json.dumps(geojson_resp, default=unknown_object_json_handler), 200)
+    resp = make_response(_dumps(geojson_resp), 200)
     resp.headers['Content-Type'] = 'application/json'
     return resp
 
 
+@lru_cache(maxsize=8192)
+def _geojson_from_hex(desc):
+    """Decode a hex EWKB descriptor into a GeoJSON dict. Rows frequently
+    share identical geometries (stations, snapped centroids), so caching
+    on the hex string turns N decodes into one per unique geometry. The
+    returned dicts are shared references and must not be mutated.
+
+    :param desc: (str) hex encoded EWKB
+    :returns: (dict) GeoJSON geometry
+    """
+    return shapely.wkb.loads(bytes.fromhex(desc)).__geo_interface__
+
+
 def convert_result_geoms(result):
     """Given a list of rows, convert the geom for each row from a shape
     to a list of coordinates.
 
+    Geoms selected with ST_AsGeoJSON (a dict via the JSONB adapter, or a
+    raw GeoJSON string) are passed through without any client-side
+    decoding; query builders that can afford a dedicated geojson select
+    should prefer that form, since it skips the EWKB round-trip entirely.
+
     :param result: (list) contains the results of some query
     :returns (list) modified result, where geoms are represented by lists
     """
     geojson_resp = geojson_response_base()
     for row in result:
-        try:
-            wkb = row.pop('geom')
-            geom = shapely.wkb.loads(wkb.desc, hex=True).__geo_interface__
-        except (KeyError, AttributeError):
+        # Rows without a usable geom are skipped with cheap checks rather
+        # than raising and catching an exception per row.
+        wkb = row.pop('geom', None)
+        if wkb is None:
             continue
+        if isinstance(wkb, dict):
+            geom = wkb
+        elif isinstance(wkb, str):
+            geom = orjson.loads(wkb)
         else:
-            add_geojson_feature(geojson_resp, geom, row)
+            desc = getattr(wkb, 'desc', None)
+            if desc is None:
+                continue
+            try:
+                geom = _geojson_from_hex(desc)
+            except ValueError:
+                continue
+        add_geojson_feature(geojson_resp, geom, row)
     return geojson_resp
 
 
@@ -187,28 +250,28 @@ def detail_aggregate_response(query_result, query_args):
         filedate = datetime.now().strftime('%Y-%m-%d')
         resp.headers['Content-Disposition'] = 'attachment; filename=%s.csv' % filedate
     else:
-        resp = json_response_base(query_args, query_result, request.args)
-        resp['count'] = sum([c['count'] for c in query_result])
-        resp = make_response(json.dumps(resp, default=unknown_object_json_handler), 200)
+        resp = json_response_base(query_args, query_result, request.args.to_dict())
+        resp['count'] = sum(map(itemgetter('count'), query_result))
+        resp = make_response(_dumps(resp), 200)
         resp.headers['Content-Type'] = 'application/json'
 
     return resp
 
 
 def meta_response(query_result, query_args):
-    resp = json_response_base(query_args, query_result, request.args)
+    resp = json_response_base(query_args, query_result, request.args.to_dict())
     resp['meta']['total'] = len(resp['objects'])
     status_code = 200
-    resp = make_response(json.dumps(resp, default=unknown_object_json_handler), status_code)
+    resp = make_response(_dumps(resp), status_code)
     resp.headers['Content-Type'] = 'application/json'
     return resp
 
 
 def fields_response(query_result, query_args):
-    resp = json_response_base(query_args, query_result, request.args)
+    resp = json_response_base(query_args, query_result, request.args.to_dict())
     resp['objects'] = query_result[0]['columns']
     status_code = 200
-    resp = make_response(json.dumps(resp, default=unknown_object_json_handler), status_code)
+    resp = make_response(_dumps(resp), status_code)
     resp.headers['Content-Type'] = 'application/json'
     return resp
 
@@ -240,22 +303,25 @@ def aggregate_point_data_response(data_type, rows, dataset_names):
 # Shape Format Headers
 # ====================
 
+_CONTENT_HEADERS = {
+    'json': 'application/json',
+    'kml': 'application/vnd.google-earth.kml+xml',
+    'shapefile': 'application/zip'
+}
+
+_FILE_EXTENSIONS = {
+    'json': 'json',
+    'kml': 'kml',
+    'shapefile': 'zip'
+}
+
+
 def _shape_format_to_content_header(requested_format):
-    format_map = {
-        'json': 'application/json',
-        'kml': 'application/vnd.google-earth.kml+xml',
-        'shapefile': 'application/zip'
-    }
-    return format_map[requested_format]
+    return _CONTENT_HEADERS[requested_format]
 
 
 def _shape_format_to_file_extension(requested_format):
-    format_map = {
-        'json': 'json',
-        'kml': 'kml',
-        'shapefile': 'zip'
-    }
-    return format_map[requested_format]
+    return _FILE_EXTENSIONS[requested_format]
 
 
 def export_dataset_to_response(shapeset, data_type, query=None):
@@ -269,23 +335,28 @@ def export_dataset_to_response(shapeset, data_type, query=None):
     try:
         # Write to that filename.
         OgrExport(export_format, export_path, shapeset.name, query).write_file()
-        # Dump it in the response.
-        with open(export_path, 'rb') as to_export:
-            resp = make_response(to_export.read(), 200)
 
         extension = _shape_format_to_file_extension(export_format)
 
+        # Don't leave that file hanging around once it has been sent.
+        @after_this_request
+        def cleanup(response):
+            if os.path.isfile(export_path):
+                os.remove(export_path)
+            return response
+
         # Make the downloaded filename look nice
         shapemeta = ShapeMetadata.get_by_dataset_name(shapeset.name)
-        resp.headers['Content-Type'] = _shape_format_to_content_header(export_format)
-        resp.headers['Content-Disposition'] = "attachment; filename='{}.{}'".format(shapemeta.human_name, extension)
-        return resp
-
-    except Exception as e:
+        return send_file(
+            export_path,
+            mimetype=_shape_format_to_content_header(export_format),
+            as_attachment=True,
+            attachment_filename='{}.{}'.format(shapemeta.human_name, extension)
+        )
+
+    except Exception:
         error_message = 'Failed to export shape dataset {}'.format(shapeset.name)
-        print((repr(e)))
-        return make_response(error_message, 500)
-    finally:
-        # Don't leave that file hanging around.
+        logger.exception(error_message)
         if os.path.isfile(export_path):
             os.remove(export_path)
+        return make_response(error_message, 500)
@@ -5,7 +5,8 @@ from flask import make_response, request
 from sqlalchemy import func
 from sqlalchemy.exc import NoSuchTableError
 
-from plenario.api.common import crossdomain, extract_first_geometry_fragment, make_fragment_str
+from plenario.api.common import CACHE_TIMEOUT, cache, crossdomain, extract_first_geometry_fragment, \
+    make_cache_key, make_fragment_str
 from plenario.api.condition_builder import parse_tree
 from plenario.api.jobs import make_job_response
 from plenario.api.point import detail_query
@@ -14,6 +15,7 @@ from plenario.api.validator import ExportFormatsValidator, Validator, has_tree_f
 from plenario.models import ShapeMetadata
 
 
+@cache.cached(timeout=CACHE_TIMEOUT, key_prefix=make_cache_key)
 @crossdomain(origin='*')
 def get_all_shape_datasets():
     """Fetches metadata for every shape dataset in meta_shape.
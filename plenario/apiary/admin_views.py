@@ -10,6 +10,7 @@ from wtforms import StringField
 
 from plenario.database import postgres_session
 from plenario.models.SensorNetwork import NetworkMeta
+from plenario.sensor_network.api.sensor_networks import forget_observation_table
 from plenario.sensor_network.redshift_ops import create_foi_table, table_exists
 from .validators import assert_json_enclosed_in_brackets, map_to_redshift_type, validate_node, \
     validate_sensor_properties
@@ -121,6 +122,10 @@ class FOIMetaView(BaseMetaView):
                     foi_properties = [{'name': e['name'], 'type': e['type']}
                                       for e in coerced_properties]
                     create_foi_table(name, foi_properties)
+                # The observation endpoints cache reflected feature tables
+                # for the life of the process. Editing a feature can change
+                # its table's schema, so make the workers re-reflect it.
+                forget_observation_table(name)
         except TypeError:
             # This will occur if you are running without an address for a
             # Redshift DB - when we attempt to create a new table 
@@ -6,6 +6,7 @@ from logging import getLogger
 from geoalchemy2 import Geometry
 from sqlalchemy import TIMESTAMP, Table, Column, MetaData, String
 from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import NoSuchTableError
 
 from plenario.database import postgres_base, postgres_engine
@@ -192,12 +193,13 @@ class Staging(object):
         return cols
 
 
-def _null_malformed_geoms(existing):
+def _null_malformed_geoms(existing, conn=None):
     # We decide to set the geom to NULL when the given lon/lat is (0,0)
     # (off the coast of Africa).
     upd = existing.update().values(geom=None).\
         where(existing.c.geom == select([func.ST_SetSRID(func.ST_MakePoint(0, 0), 4326)]))
-    postgres_engine.execute(upd)
+    bind = conn if conn is not None else postgres_engine
+    bind.execute(upd)
 
 
 def _make_col(name, type, nullable):
@@ -312,21 +314,26 @@ class Update(object):
 
         # Drop the table first out of healthy paranoia
         self._drop()
-        try:
-            self.table.create(bind=postgres_engine)
-        except Exception as e:
-            raise PlenarioETLError(repr(e) +
-                                   '\nCould not create table n_' + d.name)
 
-        ins = self.table.insert().from_select(cols_to_insert, sel)
-        # Populate it with records from our select statement.
-        try:
-            postgres_engine.execute(ins)
-        except Exception as e:
-            raise PlenarioETLError(repr(e) + '\n' + str(sel))
-        else:
-            # Would be nice to check if we have new records or not right here.
-            return self
+        # Run the create and the populating insert over one connection in
+        # one transaction, instead of checking a connection out of the pool
+        # per statement with an autocommit between them.
+        with postgres_engine.begin() as conn:
+            try:
+                self.table.create(bind=conn)
+            except Exception as e:
+                raise PlenarioETLError(repr(e) +
+                                       '\nCould not create table n_' + d.name)
+
+            ins = self.table.insert().from_select(cols_to_insert, sel)
+            # Populate it with records from our select statement.
+            try:
+                conn.execute(ins)
+            except Exception as e:
+                raise PlenarioETLError(repr(e) + '\n' + str(sel))
+
+        # Would be nice to check if we have new records or not right here.
+        return self
 
     def insert(self):
         """
@@ -339,18 +346,25 @@ class Update(object):
         sel_cols = staging_cols + derived_cols
 
         sel = select(sel_cols).where(self.staging.c.hash == self.table.c.hash)
-        ins = self.existing.insert().from_select(sel_cols, sel)
-
-        try:
-            postgres_engine.execute(ins)
-        except Exception as e:
-            raise PlenarioETLError(repr(e) +
-                                   '\n Failed on statement: ' + str(ins))
-        try:
-            _null_malformed_geoms(self.existing)
-        except Exception as e:
-            raise PlenarioETLError(repr(e) +
-                        '\n Failed to null out geoms with (0,0) geocoding')
+        # ON CONFLICT makes the insert idempotent against the hash primary
+        # key: records that slipped in since the n_ table was computed cost
+        # an index probe instead of aborting the whole statement.
+        ins = pg_insert(self.existing).from_select(sel_cols, sel). \
+            on_conflict_do_nothing(index_elements=['hash'])
+
+        # One connection and transaction for the insert and the geom
+        # cleanup that belongs with it.
+        with postgres_engine.begin() as conn:
+            try:
+                conn.execute(ins)
+            except Exception as e:
+                raise PlenarioETLError(repr(e) +
+                                       '\n Failed on statement: ' + str(ins))
+            try:
+                _null_malformed_geoms(self.existing, conn)
+            except Exception as e:
+                raise PlenarioETLError(repr(e) +
+                            '\n Failed to null out geoms with (0,0) geocoding')
 
     def _drop(self):
         postgres_engine.execute("DROP TABLE IF EXISTS {};".format(self.name))
@@ -1,12 +1,15 @@
 import json
+from functools import wraps
 
+from flask import g, has_app_context
 from geoalchemy2 import Geometry
 from sqlalchemy import BigInteger, Boolean, Column, DateTime, Float, ForeignKey, ForeignKeyConstraint, String, Table, \
-    func as sqla_fn
+    func as sqla_fn, select, text, tuple_
 from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import joinedload, relationship
 
-from plenario.database import postgres_base, postgres_engine, postgres_session, redshift_base
+from plenario.database import postgres_base, postgres_engine, postgres_session, redshift_base, \
+    redshift_engine
 
 sensor_to_node = Table(
     'sensor__sensor_to_node',
@@ -28,6 +31,29 @@ feature_to_network = Table(
 )
 
 
+def memoize_within_request(fn):
+    """Cache a method's result on ``flask.g`` so repeated calls during a
+    single request skip the recomputation (and the database round-trip
+    behind it). Outside of an application context the method runs as usual.
+
+    :param fn: method to be memoized
+    :returns: wrapped method
+    """
+    @wraps(fn)
+    def wrapper(self, *args):
+        if not has_app_context():
+            return fn(self, *args)
+        try:
+            memo = g._sensor_meta_memo
+        except AttributeError:
+            memo = g._sensor_meta_memo = {}
+        key = (fn.__qualname__, id(self)) + args
+        if key not in memo:
+            memo[key] = fn(self, *args)
+        return memo[key]
+    return wrapper
+
+
 def knn(lng, lat, k, network, sensors):
     """Execute a spatial query to select k nearest neighbors given some point.
 
@@ -100,11 +126,13 @@ class NetworkMeta(postgres_base):
     def __repr__(self):
         return '<Network {!r}>'.format(self.name)
 
+    @memoize_within_request
     def tree(self):
         sensor_tree_fn = sqla_fn.network_tree(self.name)
         sensor_tree_result_proxy = self.query.session.execute(sensor_tree_fn)
         return sensor_tree_result_proxy.scalar()
 
+    @memoize_within_request
     def sensors(self) -> set:
 
         keys = []
@@ -113,6 +141,7 @@ class NetworkMeta(postgres_base):
 
         return set(keys)
 
+    @memoize_within_request
     def features(self):
 
         keys = []
@@ -137,7 +166,10 @@ class NodeMeta(postgres_base):
 
     @staticmethod
     def all(network_name):
-        query = NodeMeta.query.filter(NodeMeta.sensor_network == network_name)
+        # Callers iterate node.sensors, so load the collection up front
+        # instead of firing a lazy-load SELECT per node.
+        query = NodeMeta.query.options(joinedload(NodeMeta.sensors))
+        query = query.filter(NodeMeta.sensor_network == network_name)
         return query.all()
 
     @staticmethod
@@ -146,10 +178,14 @@ class NodeMeta(postgres_base):
 
     @staticmethod
     def nearest_neighbor_to(lng, lat, network, features):
+        # Fetch all the requested features (and the networks their sensor
+        # resolution walks) in one query rather than a get per feature.
+        query = FeatureMeta.query.options(joinedload(FeatureMeta.networks))
+        feature_metas = query.filter(FeatureMeta.name.in_(features)).all()
+
         sensors = set()
-        for feature in features:
-            feature = FeatureMeta.query.get(feature)
-            sensors = sensors | feature.sensors()
+        for feature in feature_metas:
+            sensors |= feature.sensors()
 
         return knn(
             lng=lng,
@@ -163,17 +199,30 @@ class NodeMeta(postgres_base):
     def within_geojson(network: NetworkMeta, geojson: str):
         geom = sqla_fn.ST_GeomFromGeoJSON(geojson)
         within = NodeMeta.location.ST_Within(geom)
-        query = NodeMeta.query.filter(within)
+        query = NodeMeta.query.options(joinedload(NodeMeta.sensors))
+        query = query.filter(within)
         query = query.filter(NodeMeta.sensor_network == network.name)
         return query
 
     @staticmethod
     def sensors_from_nodes(nodes):
-        sensors_list = []
-        for node in nodes:
-            sensors_list += node.sensors
-        return set(sensors_list)
+        # Resolve all the sensors in two queries against the association
+        # table instead of triggering a lazy-load per node.
+        if not nodes:
+            return set()
+        keys = [(node.sensor_network, node.id) for node in nodes]
+        rows = postgres_session.execute(
+            select([sensor_to_node.c.sensor]).where(
+                tuple_(sensor_to_node.c.network, sensor_to_node.c.node).in_(keys)
+            ).distinct()
+        )
+        names = [row[0] for row in rows.fetchall()]
+        if not names:
+            return set()
+        query = postgres_session.query(SensorMeta)
+        return set(query.filter(SensorMeta.name.in_(names)))
 
+    @memoize_within_request
     def features(self) -> set:
         feature_set = set()
         for feature in self.tree().values():
@@ -183,6 +232,7 @@ class NodeMeta(postgres_base):
     def __repr__(self):
         return '<Node {!r}>'.format(self.id)
 
+    @memoize_within_request
     def tree(self):
         return {s.name: s.tree() for s in self.sensors}
 
@@ -202,6 +252,7 @@ class SensorMeta(postgres_base):
     def __repr__(self):
         return '<Sensor {!r}>'.format(self.name)
 
+    @memoize_within_request
     def tree(self):
         return {v: k for k, v in self.observed_properties.items()}
 
@@ -218,6 +269,7 @@ class FeatureMeta(postgres_base):
         """
         return {e['name']: e['type'] for e in self.observed_properties}
 
+    @memoize_within_request
     def sensors(self) -> set:
         """Return the set of sensors that report on this feature.
         """
@@ -232,13 +284,22 @@ class FeatureMeta(postgres_base):
 
     @staticmethod
     def index(network_name=None):
-        features = []
-        for node in postgres_session.query(NodeMeta).all():
-            if network_name is None or node.sensor_network.lower() == network_name.lower():
-                for sensor in node.sensors:
-                    for prop in sensor.observed_properties.values():
-                        features.append(prop.split('.')[0].lower())
-        return list(set(features))
+        # A single query does the work that used to be an ORM walk over
+        # every node and its lazy-loaded sensors (one SELECT per node).
+        query = text('''
+            SELECT DISTINCT lower(split_part(properties.value, '.', 1))
+            FROM sensor__sensor_metadata AS sensor
+            JOIN sensor__sensor_to_node AS s2n
+              ON s2n.sensor = sensor.name
+            JOIN sensor__node_metadata AS node
+              ON node.id = s2n.node
+             AND node.sensor_network = s2n.network,
+            jsonb_each_text(sensor.observed_properties) AS properties
+            WHERE :network IS NULL
+               OR lower(node.sensor_network) = lower(:network)
+        ''')
+        rows = postgres_session.execute(query, {'network': network_name})
+        return [row[0] for row in rows.fetchall()]
 
     @staticmethod
     def properties_of(feature):
@@ -248,13 +309,20 @@ class FeatureMeta(postgres_base):
 
     def mirror(self):
         """Create feature tables in redshift for all the networks associated
-        with this feature.
+        with this feature. The tables are built first and created in a single
+        create_all call so the DDL goes out over one connection instead of
+        one round-trip per network.
         """
-        for network in self.networks:
-            self._mirror(network.name)
+        tables = [self._build_table(network.name) for network in self.networks]
+        redshift_base.metadata.create_all(
+            bind=redshift_engine,
+            tables=tables,
+            checkfirst=True
+        )
 
-    def _mirror(self, network_name: str):
-        """Create a feature table in redshift for the specified network.
+    def _build_table(self, network_name: str) -> Table:
+        """Build (without creating) a feature table in redshift for the
+        specified network.
         """
         columns = []
         for feature in self.observed_properties:
@@ -274,7 +342,7 @@ class FeatureMeta(postgres_base):
             redshift_sortkey='datetime'
         )
 
-        redshift_table.create()
+        return redshift_table
 
     def __repr__(self):
         return '<Feature {!r}>'.format(self.name)
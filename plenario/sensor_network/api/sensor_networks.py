@@ -4,6 +4,7 @@ import json
 from datetime import datetime, timedelta
 
 import boto3
+import orjson
 from flask import Response, jsonify, redirect, request, stream_with_context
 from marshmallow import Schema
 from marshmallow.exceptions import ValidationError
@@ -159,7 +160,7 @@ def get_network_map(network: str) -> Response:
     return jsonify(network_object.tree())
 
 
-# @cache.cached(timeout=CACHE_TIMEOUT, key_prefix=make_cache_key)
+@cache.cached(timeout=CACHE_TIMEOUT, key_prefix=make_cache_key)
 @crossdomain(origin='*')
 def get_network_metadata(network: str = None) -> Response:
     '''Return metadata for some network. If no network_name is specified, the
@@ -183,7 +184,7 @@ def get_network_metadata(network: str = None) -> Response:
     return jsonify(json_response_base(validated, result, args))
 
 
-# @cache.cached(timeout=CACHE_TIMEOUT, key_prefix=make_cache_key)
+@cache.cached(timeout=CACHE_TIMEOUT, key_prefix=make_cache_key)
 @crossdomain(origin='*')
 def get_node_metadata(network: str, node: str = None) -> Response:
     '''Return metadata about nodes for some network. If no node_id or
@@ -259,7 +260,7 @@ def presigned_url(bucket: str, key: str, file_name: str) -> str:
     )
 
 
-# @cache.cached(timeout=CACHE_TIMEOUT, key_prefix=make_cache_key)
+@cache.cached(timeout=CACHE_TIMEOUT, key_prefix=make_cache_key)
 @crossdomain(origin='*')
 def get_sensor_metadata(network: str, sensor: str = None) -> Response:
     '''Return metadata for all sensors within a network. Sensors can also be
@@ -304,7 +305,7 @@ def get_sensor_metadata(network: str, sensor: str = None) -> Response:
     return jsonify(json_response_base(validated, result, args))
 
 
-# @cache.cached(timeout=CACHE_TIMEOUT, key_prefix=make_cache_key)
+@cache.cached(timeout=CACHE_TIMEOUT, key_prefix=make_cache_key)
 @crossdomain(origin='*')
 def get_feature_metadata(network: str, feature: str = None) -> Response:
     '''Return metadata about features for some network. If no feature is
@@ -532,8 +533,12 @@ def observation_query(table, **kwargs):
     '''Constructs a query used to fetch raw data from a Redshift table. Used
     by the /query and /download endpoints.'''
 
-    nodes = [n.id for n in kwargs.get('nodes')]
-    sensors = [s.name for s in kwargs.get('sensors')]
+    # Node ids and sensor names are stored lowercase (the validator fields
+    # lowercase their lookups), so lowering the Python-side values here
+    # keeps the comparison exact without wrapping the columns in lower(),
+    # which would force a per-row function call and defeat the sort key.
+    nodes = [n.id.lower() for n in kwargs.get('nodes')]
+    sensors = [s.name.lower() for s in kwargs.get('sensors')]
     limit = kwargs.get('limit')
     offset = kwargs.get('offset')
     start_dt = kwargs.get('start_datetime')
@@ -544,8 +549,8 @@ def observation_query(table, **kwargs):
     q = redshift_session.query(table)
     q = q.filter(table.c.datetime >= start_dt) if start_dt else q
     q = q.filter(table.c.datetime < end_dt) if end_dt else q
-    q = q.filter(sqla_fn.lower(table.c.node_id).in_(nodes)) if nodes else q
-    q = q.filter(sqla_fn.lower(table.c.sensor).in_(sensors)) if sensors else q
+    q = q.filter(table.c.node_id.in_(nodes)) if nodes else q
+    q = q.filter(table.c.sensor.in_(sensors)) if sensors else q
     try:
         q = q.filter(table.c[property_] != None) if property_ else q
     except KeyError:
@@ -564,11 +569,23 @@ def format_network_metadata(network):
     :param network: (Row) sensor__network_metadata object
     :returns: (dict) formatted result'''
 
+    # Fetch the network tree once and derive nodes, sensors and features
+    # from it in a single walk, instead of letting features() and
+    # sensors() each re-walk the same structure per network.
+    tree = network.tree()
+
+    sensors = set()
+    features = set()
+    for node_sensors in tree.values():
+        for sensor_name, properties in node_sensors.items():
+            sensors.add(sensor_name)
+            features.update(p.split('.')[0] for p in properties.values())
+
     network_response = {
         'name': network.name,
-        'features': sorted(list(network.features())),
-        'nodes': sorted([n for n in network.tree()]),
-        'sensors': sorted(list(network.sensors())),
+        'features': sorted(features),
+        'nodes': sorted(tree),
+        'sensors': sorted(sensors),
         'info': network.info
     }
 
@@ -632,6 +649,32 @@ def format_feature_metadata(feature):
     return feature_response
 
 
+_OBSERVATION_META_PROPERTIES = frozenset(['node_id', 'datetime', 'sensor', 'meta_id'])
+
+# Property column names per feature table, keyed by table name. Entries
+# live as long as the reflected tables below and are evicted together with
+# them by forget_observation_table when a feature's schema changes.
+_observation_property_columns = {}
+
+
+def observation_property_columns(table):
+    '''Names of the property (non-meta) columns of a feature table,
+    computed once per table instead of once per formatted row.
+
+    :param table: (SQLAlchemy.Table) table object for a single feature
+    :returns: (tuple) property column names'''
+
+    try:
+        return _observation_property_columns[table.name]
+    except KeyError:
+        columns = tuple(
+            c.name for c in table.c
+            if c.name not in _OBSERVATION_META_PROPERTIES
+        )
+        _observation_property_columns[table.name] = columns
+        return columns
+
+
 def format_observation(obs, table):
     '''Response format for a feature observation.
 
@@ -639,34 +682,68 @@ def format_observation(obs, table):
     :param table: (SQLAlchemy.Table) table object for a single feature
     :returns: (dict) formatted result'''
 
+    properties = observation_property_columns(table)
+
+    # Strip any timezone before formatting rather than slicing the suffix
+    # off the rendered string, which allocated an extra str and list per row.
+    dt = obs.datetime
+    if dt.tzinfo is not None:
+        dt = dt.replace(tzinfo=None)
+
     obs_response = {
         'node': obs.node_id,
         'meta_id': obs.meta_id,
-        'datetime': obs.datetime.isoformat().split('+')[0],
+        'datetime': dt.isoformat(),
         'sensor': obs.sensor,
         'feature': table.name.split('__', 1)[-1],
-        'results': {}
+        'results': {prop: getattr(obs, prop) for prop in properties}
     }
 
-    meta_properties = {'node_id', 'datetime', 'sensor', 'meta_id'}
-    all_properties = set([c.name for c in table.c])
-    for prop in all_properties - meta_properties:
-        obs_response['results'][prop] = getattr(obs, prop)
-
     return obs_response
 
 
+# Reflected Redshift feature tables, keyed by name. Reflection issues
+# information-schema queries against the warehouse, so do it at most once
+# per process per table rather than once per feature per request.
+_reflected_tables = {}
+
+
+def reflect_observation_table(table_name):
+    '''Return the reflected Redshift table for a feature, reflecting it on
+    first use and from the module cache afterwards.
+
+    :param table_name: (str) name of a network__feature table
+    :returns: (SQLAlchemy.Table) reflected table'''
+
+    try:
+        return _reflected_tables[table_name]
+    except KeyError:
+        table = reflect(table_name, MetaData(), redshift_engine)
+        _reflected_tables[table_name] = table
+        return table
+
+
+def forget_observation_table(table_name):
+    '''Drop a feature table from the reflection and property-column caches,
+    forcing the next request to re-reflect it (for when a feature's schema
+    changes).
+
+    :param table_name: (str) name of a network__feature table'''
+
+    _reflected_tables.pop(table_name, None)
+    _observation_property_columns.pop(table_name, None)
+
+
 def get_observation_queries(args):
     '''Queries used to get raw feature of interest rows from Redshift.'''
 
-    tables = []
     network = args.data['network']
     features = args.data['features']
 
-    for feature in features:
-        table_name = network.name + '__' + feature.name
-        table = reflect(table_name, MetaData(), redshift_engine)
-        tables.append(table)
+    tables = [
+        reflect_observation_table(network.name + '__' + feature.name)
+        for feature in features
+    ]
 
     return [(observation_query(table, **args.data), table) for table in tables]
 
@@ -782,23 +859,36 @@ def get_observation_datadump_json(**kwargs):
 
     queries_and_tables = get_observation_queries(vr_proxy)
 
-    chunksize = 1000
-    buffer = '{"objects": ['
+    # Accumulate serialized rows in a list and flush on accumulated bytes
+    # rather than row count, so chunks stay a steady size no matter how
+    # wide the feature tables are and no quadratic bytes-concat happens.
+    flush_at = 64 * 1024
+
+    parts = [b'{"objects": [']
+    buffered = len(parts[0])
+    first = True
 
     for query, table in queries_and_tables:
         columns = [c.name for c in table.c]
 
-        for i, row in enumerate(query.yield_per(1000)):
-            row = dict(zip(columns, row))
-            buffer += json.dumps(row, default=unknown_object_json_handler)
-            buffer += ','
-
-            if i % chunksize == 0:
-                yield buffer
-                buffer = ''
-
-    # Remove the trailing comma and close the json
-    yield buffer.rsplit(',', 1)[0] + ']}'
+        for row in query.yield_per(1000):
+            part = orjson.dumps(
+                dict(zip(columns, row)),
+                default=unknown_object_json_handler
+            )
+            if first:
+                first = False
+            else:
+                part = b',' + part
+            parts.append(part)
+            buffered += len(part)
+
+            if buffered >= flush_at:
+                yield b''.join(parts)
+                parts = []
+                buffered = 0
+
+    yield b''.join(parts) + b']}'
 
 
 def get_raw_metadata():
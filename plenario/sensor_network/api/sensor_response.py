@@ -1,5 +1,4 @@
-import json
-
+import orjson
 from flask import make_response, request
 
 from plenario.api.common import unknown_object_json_handler
@@ -12,9 +11,9 @@ def make_error(msg, status_code):
         'error': msg,
     }
 
-    resp['meta']['query'] = request.args
+    resp['meta']['query'] = request.args.to_dict()
     resp = make_response(
-        json.dumps(resp, default=unknown_object_json_handler),
+        orjson.dumps(resp, default=unknown_object_json_handler),
         status_code
     )
     resp.headers['Content-Type'] = 'application/json'
@@ -15,6 +15,7 @@ from plenario.etl.point import PlenarioETL
 from plenario.etl.shape import ShapeETL
 from plenario.models import MetaTable, ShapeMetadata
 from plenario.settings import CELERY_BROKER_URL, S3_BUCKET, PLENARIO_SENTRY_URL, CELERY_RESULT_BACKEND
+from plenario.utils import helpers
 from plenario.utils.helpers import reflect
 from plenario.utils.weather import WeatherETL
 
@@ -56,6 +57,17 @@ def health() -> bool:
     return True
 
 
+@worker.task()
+def send_mail(subject: str, recipient: str, body: str) -> bool:
+    """Deliver an email through SES off the request path, so views are not
+    blocked on the mail service handshake.
+    """
+    logger.info('Begin. (recipient: "{}")'.format(recipient))
+    helpers.send_mail(subject=subject, recipient=recipient, body=body)
+    logger.info('End.')
+    return True
+
+
 @worker.task()
 def add_dataset(name: str) -> bool:
     """Ingest the row information for an approved point dataset.
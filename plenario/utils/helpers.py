@@ -29,21 +29,29 @@ ColumnInfo = namedtuple('ColumnInfo', 'name type_ has_nulls')
 
 def infer_csv_columns(inp):
     """
-    :param inp: File handle to a CSV dataset that we can throw into a UnicodeCSVReader
+    :param inp: File handle to a CSV sample that fits in memory
     :return: List of `ColumnInfo`s
     """
     reader = csv.reader(inp)
     header = next(reader)
-    inp.seek(0)
-    iter_output = [iter_column(col_idx, inp)
-                   for col_idx in range(len(header))]
 
-    return [ColumnInfo(name, type_, has_nulls)
-            for name, (type_, has_nulls) in zip(header, iter_output)]
+    # Accumulate every column in one pass over the sample rather than
+    # rewinding and re-parsing the whole file once per column. Short rows
+    # simply contribute fewer values, as before.
+    columns = [[] for _ in header]
+    for row in reader:
+        if row:
+            for col, value in zip(columns, row):
+                col.append(value)
+
+    return [ColumnInfo(name, *normalize_column_type(col))
+            for name, col in zip(header, columns)]
 
 
 def iter_column(idx, f):
-    """
+    """Used by the ETL, where whole datasets are too large to transpose
+    in memory the way infer_csv_columns does with its bounded sample.
+
     :param idx: index of column
     :param f: gzip file object of CSV dataset
     :return: col_type, null_values
@@ -121,6 +129,12 @@ def reflect(table_name, metadata, engine):
     :param engine: (Engine) SQLAlchemy object to send queries to the database
     :returns: (Table) SQLAlchemy object
     """
+    # MetaData remembers every table it has reflected; reusing that entry
+    # skips the catalog queries autoload would issue all over again.
+    table = metadata.tables.get(table_name)
+    if table is not None:
+        return table
+
     return Table(
         table_name,
         metadata,
@@ -1,26 +1,26 @@
 # TODO: this needs to be refactored. we've got views, utils, forms... this needs a lot of attention
 
-import itertools
 import re
 from collections import namedtuple
+from functools import wraps
 from hashlib import md5
-from io import StringIO
 from urllib.parse import urlparse
 
 import requests
-from flask import Blueprint, flash, redirect, render_template, request, session as flask_session, url_for
+from flask import Blueprint, flash, make_response, redirect, render_template, request, \
+    session as flask_session, url_for
 from flask_login import login_required
 from flask_wtf import Form
-from sqlalchemy import Table
-from sqlalchemy.exc import NoSuchTableError
+from sqlalchemy.exc import ProgrammingError
 from wtforms import SelectField, StringField
 from wtforms.validators import DataRequired
 
 import plenario.tasks as worker
-from plenario.database import postgres_base, postgres_engine as engine, postgres_session
+from plenario.api.common import cache
+from plenario.database import postgres_session
 from plenario.models import MetaTable, ShapeMetadata, User
 from plenario.settings import FLOWER_URL
-from plenario.utils.helpers import infer_csv_columns, send_mail, slugify
+from plenario.utils.helpers import infer_csv_columns, slugify
 
 
 views = Blueprint('views', __name__)
@@ -29,12 +29,33 @@ views = Blueprint('views', __name__)
 # (Mostly) Static pages
 
 
+def static_page(max_age=3600):
+    """Mark a template-only view as cacheable: attach Cache-Control and an
+    ETag so browsers and proxies serve repeat visits with a 304 instead of
+    re-downloading (and us re-rendering) the page.
+
+    :param max_age: seconds a client may reuse the response without asking
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapped(*args, **kwargs):
+            resp = make_response(fn(*args, **kwargs))
+            resp.cache_control.public = True
+            resp.cache_control.max_age = max_age
+            resp.add_etag()
+            return resp.make_conditional(request)
+        return wrapped
+    return decorator
+
+
 @views.route('/')
+@static_page()
 def index():
     return render_template('index.html')
 
 
 @views.route('/explore')
+@static_page()
 def explore_view():
     return render_template('explore.html')
 
@@ -42,6 +63,7 @@ def explore_view():
 # If the user requests a nested URL within the Ember app,
 # we still just need to render the Ember app.
 @views.route('/explore/<path:path>')
+@static_page()
 def explore_kludge(path):
     return render_template('explore.html')
 
@@ -52,6 +74,7 @@ def api_docs_view():
 
 
 @views.route('/about')
+@static_page()
 def about_view():
     return render_template('about.html')
 
@@ -67,6 +90,7 @@ def maintenance():
 
 
 @views.route('/terms')
+@static_page()
 def terms_view():
     return render_template('terms.html')
 
@@ -85,6 +109,7 @@ def approve_shape(dataset_name):
     meta.approved_status = True
     meta.celery_task_id = ticket
     postgres_session.commit()
+    purge_dataset_listing()
 
     send_approval_email(
         meta.human_name,
@@ -107,6 +132,7 @@ def approve_dataset(source_url_hash):
     meta.approved_status = True
     meta.result_ids = [ticket]
     postgres_session.commit()
+    purge_dataset_listing()
 
     send_approval_email(
         meta.human_name,
@@ -116,22 +142,21 @@ def approve_dataset(source_url_hash):
 
 
 def send_approval_email(dataset_name, contributor_name, contributor_email):
-    # Email the submitter
-    # TODO: this really should be a template that jinja loads up and then we send the interpolated string
-    msg_body = """Hello %s,\r\n
-\r\n
-Your dataset has been approved and added to Plenar.io:\r\n
-\r\n
-%s\r\n
-\r\n
-It should appear on http://plenar.io within 24 hours.\r\n
-\r\n
-Thank you!\r\n
-The Plenario Team\r\n
-http://plenar.io""" % (contributor_name, dataset_name)
-
-    send_mail(subject="Your dataset has been added to Plenar.io",
-              recipient=contributor_email, body=msg_body)
+    # Email the submitter. Jinja compiles and caches the template; the
+    # CRLF endings keep send_mail's plain-text to HTML conversion working.
+    msg_body = render_template(
+        'email/approved.txt',
+        contributor_name=contributor_name,
+        dataset_name=dataset_name
+    ).replace('\n', '\r\n')
+
+    # Deliver from the worker queue; SES handshakes are slow enough to
+    # stall the request otherwise.
+    worker.send_mail.delay(
+        subject="Your dataset has been added to Plenar.io",
+        recipient=contributor_email,
+        body=msg_body
+    )
 
 
 # Submit a dataset (Add it to MetaData and try to ingest it now or later.)
@@ -155,15 +180,17 @@ def user_add_dataset():
 
 
 def send_submission_email(dataset_name, contributor_name, contributor_email):
-    # TODO: this really should be a template that jinja loads up and then we send the interpolated string
-    msg_body = """Hello %s,\r\n\r\n
-We received your recent dataset submission to Plenar.io:\r\n\r\n%s\r\n\r\n
-After we review it, we'll notify you when your data is loaded and available.\r\n\r\n
-Thank you!\r\nThe Plenario Team\r\nhttp://plenar.io""" % (contributor_name, dataset_name)
-
-    send_mail(subject="Your dataset has been submitted to Plenar.io",
-              recipient=contributor_email,
-              body=msg_body)
+    msg_body = render_template(
+        'email/submitted.txt',
+        contributor_name=contributor_name,
+        dataset_name=dataset_name
+    ).replace('\n', '\r\n')
+
+    worker.send_mail.delay(
+        subject="Your dataset has been submitted to Plenar.io",
+        recipient=contributor_email,
+        body=msg_body
+    )
 
     return redirect(url_for('views.contrib_thankyou'))
 
@@ -214,6 +241,7 @@ def submit(context):
 
     else:
         # Successfully stored the metadata
+        purge_dataset_listing()
         # Now fire ingestion task...
         if is_admin:
             meta.is_approved = True
@@ -281,7 +309,10 @@ def form_columns(form):
 
 def csv_already_submitted(url):
     digest = md5(bytes(url, encoding="utf-8")).hexdigest()
-    return postgres_session.query(MetaTable).get(digest) is not None
+    # Only the existence of the record matters; selecting one column
+    # skips hydrating the full MetaTable row.
+    query = postgres_session.query(MetaTable.source_url_hash)
+    return query.filter(MetaTable.source_url_hash == digest).scalar() is not None
 
 
 def shape_already_submitted(name):
@@ -345,6 +376,9 @@ def shape_meta_from_submit_form(form, is_approved):
 
 # Suggestion helpers.
 
+# Socrata dataset ids ('4x4s') as they appear in dataset URLs.
+FOUR_BY_FOUR_RE = re.compile(r'/([a-z0-9]{4}-[a-z0-9]{4})')
+
 ColumnMeta = namedtuple('ColumnMeta', 'name type_ description')
 DescriptionMeta = namedtuple("DescriptionMeta",
                              'human_name attribution description')
@@ -410,15 +444,20 @@ class GenericSuggestion(object):
         self.view_url = None
         self.columns = (None if is_shapefile else self._infer_columns())
 
+    # How much of a suggested file to download for column sniffing. Bounding
+    # the read by bytes (rather than lines) means a huge CSV pointed at the
+    # contribute page can't stall a worker on an unbounded download.
+    SNIFF_BYTES = 512 * 1024
+
     def _infer_columns(self):
-        r = requests.get(self.file_url, stream=True)
-        inp = StringIO()
+        with requests.get(self.file_url, stream=True, timeout=(3, 10)) as r:
+            raw = r.raw.read(self.SNIFF_BYTES, decode_content=True)
 
-        head = itertools.islice(r.iter_lines(), 1000)
-        for line in head:
-            inp.write(line.decode("utf-8") + '\n')
-        inp.seek(0)
-        column_info = infer_csv_columns(inp)
+        lines = raw.decode('utf-8', 'replace').splitlines()
+        if len(raw) == self.SNIFF_BYTES:
+            # The read probably stopped mid-line; drop the truncated tail.
+            lines = lines[:-1]
+        column_info = infer_csv_columns(iter(lines[:1001]))
 
         return [ColumnMeta(name, type_.__visit_name__.lower(), '')
                 for name, type_, _ in column_info]
@@ -551,8 +590,8 @@ class SocrataSuggestion(object):
         :return: 4x4 string like abc1-d2ef if found
                  else None
         """
-        url = url.strip(' \t\n\r')  # strip whitespace, tabs, etc
-        matches = re.findall(r'/([a-z0-9]{4}-[a-z0-9]{4})', url)
+        url = url.strip()
+        matches = FOUR_BY_FOUR_RE.findall(url)
         if matches:
             return matches[-1]
         else:
@@ -566,13 +605,32 @@ class SocrataSuggestion(object):
 # Monitoring and editing point datasets
 
 
+@cache.memoize(timeout=300)
+def dataset_listing():
+    """The four record lists behind the admin view-datasets page, cached so
+    repeated page loads skip the queries. Mutating admin actions call
+    purge_dataset_listing to drop the entry.
+
+    :returns: (tuple) pending point metas, pending shape metas, approved
+              point metas with ETL status, approved shape metas with ETL
+              status"""
+
+    return (
+        fetch_pending_tables(MetaTable),
+        fetch_pending_tables(ShapeMetadata),
+        MetaTable.get_all_with_etl_status(),
+        ShapeMetadata.get_all_with_etl_status(),
+    )
+
+
+def purge_dataset_listing():
+    cache.delete_memoized(dataset_listing)
+
+
 @views.route('/admin/view-datasets')
 @login_required
 def view_datasets():
-    datasets_pending = fetch_pending_tables(MetaTable)
-    shapes_pending = fetch_pending_tables(ShapeMetadata)
-    datasets = MetaTable.get_all_with_etl_status()
-    shapesets = ShapeMetadata.get_all_with_etl_status()
+    datasets_pending, shapes_pending, datasets, shapesets = dataset_listing()
 
     return render_template('admin/view-datasets.html',
                            datasets_pending=datasets_pending,
@@ -619,6 +677,7 @@ def edit_shape(dataset_name):
             .filter(ShapeMetadata.dataset_name == meta.dataset_name) \
             .update(upd)
         postgres_session.commit()
+        purge_dataset_listing()
 
         if not meta.approved_status:
             approve_shape(dataset_name)
@@ -645,6 +704,7 @@ def update_shape_view(dataset_name):
     ticket = worker.update_shape.delay(dataset_name).id
     meta.celery_task_id = ticket
     postgres_session.commit()
+    purge_dataset_listing()
     return redirect(url_for('views.view_datasets'))
 
 
@@ -693,26 +753,6 @@ class EditDatasetForm(Form):
 @login_required
 def edit_dataset(source_url_hash):
     form = EditDatasetForm()
-    meta = postgres_session.query(MetaTable).get(source_url_hash)
-    fieldnames = meta.column_names
-    num_rows = 0
-
-    if meta.approved_status:
-        try:
-            table_name = meta.dataset_name
-            table = Table(table_name, postgres_base.metadata,
-                          autoload=True, autoload_with=engine)
-
-            # Would prefer to just get the names from the metadata
-            # without needing to reflect.
-            fieldnames = list(table.columns.keys())
-            pk_name = [p.name for p in table.primary_key][0]
-            pk = table.c[pk_name]
-            num_rows = postgres_session.query(pk).count()
-
-        except NoSuchTableError:
-            # dataset has been approved, but perhaps still processing.
-            pass
 
     if form.validate_on_submit():
         upd = {
@@ -725,18 +765,38 @@ def edit_dataset(source_url_hash):
             'location': form.location.data,
             'observed_date': form.observed_date.data,
         }
-        postgres_session.query(MetaTable) \
-            .filter(MetaTable.source_url_hash == meta.source_url_hash) \
-            .update(upd)
+        # A single UPDATE ... RETURNING hands back the two values the rest
+        # of this branch needs, instead of hydrating the full row first.
+        result = postgres_session.execute(
+            MetaTable.__table__.update()
+            .where(MetaTable.source_url_hash == source_url_hash)
+            .values(**upd)
+            .returning(MetaTable.approved_status, MetaTable.human_name)
+        )
+        approved_status, human_name = result.fetchone()
         postgres_session.commit()
+        purge_dataset_listing()
 
-        if not meta.approved_status:
+        if not approved_status:
             approve_dataset(source_url_hash)
 
-        flash('%s updated successfully!' % meta.human_name, 'success')
+        flash('%s updated successfully!' % human_name, 'success')
         return redirect(url_for('views.view_datasets'))
-    else:
-        pass
+
+    meta = postgres_session.query(MetaTable).get(source_url_hash)
+    # The registry records the column names at ingest time, so there is no
+    # need to autoload the table (several catalog queries) per page render.
+    fieldnames = meta.column_names
+    num_rows = 0
+
+    if meta.approved_status:
+        try:
+            num_rows = postgres_session.execute(
+                'SELECT count(*) FROM "{}"'.format(meta.dataset_name)
+            ).scalar()
+        except ProgrammingError:
+            # dataset has been approved, but perhaps still processing.
+            postgres_session.rollback()
 
     context = {
         'form': form,
@@ -752,6 +812,7 @@ def edit_dataset(source_url_hash):
 def delete_dataset_view(source_url_hash):
     meta = postgres_session.query(MetaTable).get(source_url_hash)
     worker.delete_dataset.delay(meta.dataset_name)
+    purge_dataset_listing()
     return redirect(url_for('views.view_datasets'))
 
 
@@ -763,6 +824,7 @@ def update_dataset_view(source_url_hash):
     meta.result_ids = [ticket]
     postgres_session.add(meta)
     postgres_session.commit()
+    purge_dataset_listing()
 
     return redirect(url_for('views.view_datasets'))
 
@@ -782,6 +844,7 @@ def shape_status():
 @login_required
 def delete_shape_view(table_name):
     worker.delete_shape.delay(table_name)
+    purge_dataset_listing()
     return redirect(url_for('views.view_datasets'))
 
 